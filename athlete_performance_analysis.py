@@ -1,21 +1,37 @@
+import os
+import sys
+
 import pandas as pd
 
-# Step 1: Load the datasets
-leaderboard_data = pd.read_csv('data/processed/rogue_leaderboard_2024.csv')  # Athlete performance data
-events_data = pd.read_csv('data/processed/full_event_details.csv')  # Event details
+# The snapshot helpers live in scripts/, whose modules import each other by name
+sys.path.append('scripts')
+from snapshot import CURRENT_FILE, load_snapshot, snapshot_to_long  # noqa: E402
 
-# Step 2: Reshape leaderboard data to long format
-leaderboard_long = leaderboard_data.melt(
-    id_vars=['Athlete', 'Division'],  # Columns to keep in the reshaped format
-    var_name='Event',  # New column name for event identifiers
-    value_name='Placement'  # New column name for placement data
-)
+SNAPSHOT_DIR = 'data/processed/snapshot'
+
+# Step 1: Load the placements, preferring the memory-mapped snapshot over the CSV
+if os.path.exists(os.path.join(SNAPSHOT_DIR, CURRENT_FILE)):
+    leaderboard_long = snapshot_to_long(load_snapshot(SNAPSHOT_DIR))
+    leaderboard_long = leaderboard_long.astype({'Athlete': str, 'Division': str, 'Event_ID': str})
+else:
+    leaderboard_data = pd.read_csv('data/processed/rogue_leaderboard_2024.csv')  # Athlete performance data
+    placement_columns = [col for col in leaderboard_data.columns if col.endswith('_Placement')]
+
+    # Step 2: Reshape leaderboard placements to long format
+    leaderboard_long = leaderboard_data.melt(
+        id_vars=['Athlete', 'Athlete_ID', 'Division'],  # Columns to keep in the reshaped format
+        value_vars=placement_columns,  # Only placements, not scores or overall rank
+        var_name='Event',  # New column name for event identifiers
+        value_name='Placement'  # New column name for placement data
+    )
 
-# Step 3: Extract event IDs for clarity
-leaderboard_long['Event_ID'] = leaderboard_long['Event'].str.extract(r'(E\d+)_')[0]
+    # Step 3: Extract event IDs for clarity
+    leaderboard_long['Event_ID'] = leaderboard_long['Event'].str.extract(r'(E\d+)_')[0]
 
-# Step 4: Convert Placement column to numeric
-leaderboard_long['Placement'] = pd.to_numeric(leaderboard_long['Placement'], errors='coerce')
+    # Step 4: Convert Placement column to numeric
+    leaderboard_long['Placement'] = pd.to_numeric(leaderboard_long['Placement'], errors='coerce')
+
+events_data = pd.read_csv('data/processed/full_event_details.csv')  # Event details
 
 # Step 5: Add event details by merging with the events dataset
 leaderboard_long = leaderboard_long.merge(
@@ -28,9 +44,14 @@ leaderboard_long = leaderboard_long.merge(
 # Ensure no missing placements
 leaderboard_long = leaderboard_long.dropna(subset=['Placement'])
 
+# Order by event, then leaderboard order, whichever source was used
+leaderboard_long = leaderboard_long.sort_values(
+    'Event_ID', key=lambda event_ids: event_ids.str[1:].astype(int), kind='stable'
+)
+
 # Rearrange columns for clarity
 leaderboard_long = leaderboard_long[
-    ['Athlete', 'Division', 'Event_ID', 'Event Type', 'Intensity Level', 'Day', 'Placement']
+    ['Athlete', 'Athlete_ID', 'Division', 'Event_ID', 'Event Type', 'Intensity Level', 'Day', 'Placement']
 ]
 
 # Step 7: Save the reshaped leaderboard for future use
@@ -0,0 +1,177 @@
+# Import necessary libraries
+import numpy as np
+import pandas as pd
+
+from event_centric_analysis import load_data, preprocess_events
+
+# Define constants
+EVENT_FEATURES = ['Fatigue Index', 'Movement Complexity', 'Intensity Level']
+SIMILARITY_MEMORY_BUDGET = 256 * 1024 ** 2  # bytes of scratch space per batch of similarity queries
+# Scratch bytes per query row and candidate: float32 similarity, bool same-athlete mask, int64 argpartition output
+SIMILARITY_BYTES_PER_CELL = 4 + 1 + 8
+
+
+# Function to build the athletes x events placement matrix
+def build_placement_matrix(leaderboard):
+    """Build an athletes x events matrix of placements scaled to [0, 1] within each division."""
+    placement_columns = [col for col in leaderboard.columns if col.endswith('_Placement')]
+    placements = leaderboard[placement_columns].apply(pd.to_numeric, errors='coerce')
+    placements.columns = [col[:-len('_Placement')] for col in placement_columns]
+
+    # Scale so 0 is first and 1 is last, making divisions and field sizes comparable
+    field_size = placements.groupby(leaderboard['Division']).transform('max')
+    scaled = (placements - 1) / (field_size - 1).where(field_size > 1)
+    id_columns = [col for col in ['Athlete', 'Athlete_ID', 'Division'] if col in leaderboard.columns]
+    scaled.index = pd.MultiIndex.from_frame(leaderboard[id_columns])
+    return scaled
+
+
+# Function to compute event-to-event correlations
+def compute_event_correlations(placement_matrix):
+    """Compute Spearman correlations between events, ranking only athletes who completed both events."""
+    events = placement_matrix.columns
+    correlations = pd.DataFrame(np.nan, index=events, columns=events)
+
+    # Events completed by the same athletes share a ranking, so correlate them in blocks
+    completed = placement_matrix.notna()
+    patterns = {}
+    for event in events:
+        patterns.setdefault(completed[event].to_numpy().tobytes(), []).append(event)
+    groups = list(patterns.values())
+
+    for i, group_a in enumerate(groups):
+        for group_b in groups[i:]:
+            both = completed[group_a[0]] & completed[group_b[0]]
+            columns = list(dict.fromkeys(group_a + group_b))
+            ranks = placement_matrix.loc[both, columns].rank()
+            spread = ranks.std(ddof=0).replace(0, np.nan)
+            standardized = ((ranks - ranks.mean()) / spread).to_numpy()
+            block = standardized.T @ standardized / max(int(both.sum()), 1)
+            block = pd.DataFrame(block, index=columns, columns=columns)
+            correlations.loc[group_a, group_b] = block.loc[group_a, group_b].to_numpy()
+            correlations.loc[group_b, group_a] = block.loc[group_b, group_a].to_numpy()
+    return correlations
+
+
+# Function to build the standardized event feature matrix
+def build_event_feature_matrix(event_details, features=EVENT_FEATURES):
+    """Standardize the event features produced by preprocess_events."""
+    feature_matrix = event_details.set_index('Event')[features].astype(float)
+    feature_matrix = feature_matrix.fillna(feature_matrix.mean())
+    spread = feature_matrix.std(ddof=0).replace(0, 1)
+    return (feature_matrix - feature_matrix.mean()) / spread
+
+
+# Function to compute event-to-event similarity from event features
+def compute_event_feature_similarity(feature_matrix):
+    """Compute cosine similarity between events from their standardized features."""
+    values = feature_matrix.to_numpy()
+    norms = np.linalg.norm(values, axis=1, keepdims=True)
+    unit = values / np.where(norms == 0, 1, norms)
+    return pd.DataFrame(unit @ unit.T, index=feature_matrix.index, columns=feature_matrix.index)
+
+
+# Function to build unit-length athlete profiles
+def build_athlete_profiles(placement_matrix):
+    """Center each event, fill missing events with the event average and scale rows to unit length."""
+    centered = placement_matrix - placement_matrix.mean()
+    values = centered.fillna(0).to_numpy(dtype=np.float32)
+    norms = np.linalg.norm(values, axis=1, keepdims=True)
+    return values / np.where(norms == 0, 1, norms)
+
+
+# Function to relate athlete performance to event features
+def compute_feature_affinity(placement_matrix, feature_matrix):
+    """Score how much better than average each athlete places as each event feature increases."""
+    events = placement_matrix.columns.intersection(feature_matrix.index)
+    centered = (placement_matrix[events] - placement_matrix[events].mean()).fillna(0)
+    affinity = -centered.to_numpy() @ feature_matrix.loc[events].to_numpy() / len(events)
+    return pd.DataFrame(affinity, index=placement_matrix.index, columns=feature_matrix.columns)
+
+
+# Function to identify the athlete behind each row of the placement matrix
+def get_athlete_keys(placement_matrix):
+    """Return the Athlete_ID of each row, or (Athlete, Division) when the matrix has no Athlete_ID."""
+    if 'Athlete_ID' in placement_matrix.index.names:
+        return placement_matrix.index.get_level_values('Athlete_ID').to_numpy()
+    keys = np.empty(len(placement_matrix), dtype=object)
+    keys[:] = list(zip(placement_matrix.index.get_level_values('Athlete'),
+                       placement_matrix.index.get_level_values('Division')))
+    return keys
+
+
+# Function to find the most similar athletes
+def find_similar_athletes(placement_matrix, k=5, athlete_keys=None, memory_budget=SIMILARITY_MEMORY_BUDGET):
+    """Return the top-k most similar rows of other athletes by cosine similarity of their profiles.
+
+    Rows belonging to the same athlete (e.g. other seasons) are never returned as neighbours.
+    `athlete_keys` selects the query athletes by the keys from get_athlete_keys.
+    Queries are scored in batches sized so their scratch arrays fit in `memory_budget` bytes.
+    """
+    profiles = build_athlete_profiles(placement_matrix)
+    keys = get_athlete_keys(placement_matrix)
+    codes, _ = pd.factorize(keys)
+    labels = placement_matrix.index.to_frame(index=False)
+    result_columns = (list(labels.columns) + [f'Similar {col}' for col in labels.columns]
+                      + ['Similarity', 'Similarity Rank'])
+
+    if athlete_keys is None:
+        query_rows = np.arange(len(keys))
+    else:
+        query_rows = np.flatnonzero(pd.Series(keys).isin(list(athlete_keys)).to_numpy())
+    k = min(k, len(keys) - 1)
+    if k < 1 or len(query_rows) == 0:
+        return pd.DataFrame(columns=result_columns)
+
+    # Score queries in batches whose batch x population scratch arrays fit the memory budget
+    batch_size = max(1, memory_budget // (len(keys) * SIMILARITY_BYTES_PER_CELL))
+    neighbours, scores = [], []
+    for start in range(0, len(query_rows), batch_size):
+        rows = query_rows[start:start + batch_size]
+        similarity = profiles[rows] @ profiles.T
+        similarity[codes[rows][:, None] == codes[None, :]] = -np.inf
+        top = np.argpartition(similarity, -k, axis=1)[:, -k:]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        neighbours.append(np.take_along_axis(top, order, axis=1))
+        scores.append(np.take_along_axis(top_scores, order, axis=1))
+    neighbours = np.vstack(neighbours).ravel()
+    scores = np.vstack(scores).ravel()
+
+    query = labels.iloc[np.repeat(query_rows, k)].reset_index(drop=True)
+    similar = labels.iloc[neighbours].reset_index(drop=True).add_prefix('Similar ')
+    result = pd.concat([query, similar], axis=1)
+    result['Similarity'] = scores
+    result['Similarity Rank'] = np.tile(np.arange(1, k + 1), len(query_rows))
+
+    # Drop slots left empty when an athlete has fewer than k other athletes to compare with
+    return result[np.isfinite(scores)].reset_index(drop=True)[result_columns]
+
+
+# Main function
+def main(leaderboard_path, event_details_path):
+    """Main function to run the event correlation and athlete similarity analysis."""
+    # Load and preprocess data
+    leaderboard = pd.read_csv(leaderboard_path)
+    event_details = preprocess_events(load_data(event_details_path))
+
+    # Build matrices
+    placement_matrix = build_placement_matrix(leaderboard)
+    feature_matrix = build_event_feature_matrix(event_details)
+
+    # Report results
+    print('Event placement correlations:')
+    print(compute_event_correlations(placement_matrix).round(2))
+    print('\nEvent feature similarity:')
+    print(compute_event_feature_similarity(feature_matrix).round(2))
+    print('\nAthlete affinity to event features:')
+    print(compute_feature_affinity(placement_matrix, feature_matrix).round(3))
+    print('\nMost similar athletes:')
+    print(find_similar_athletes(placement_matrix, k=3).to_string(index=False))
+
+
+# Entry point
+if __name__ == '__main__':
+    leaderboard_path = 'data/processed/rogue_leaderboard_2024.csv'
+    event_details_path = 'data/processed/full_event_details.csv'
+    main(leaderboard_path, event_details_path)
@@ -1,3 +1,6 @@
+from .athlete_index import *
 from .process_events import *
 from .process_leaderboard import *
+from .snapshot import *
 from .utils import *
+from .validate_leaderboard import *
@@ -0,0 +1,305 @@
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+from utils import ensure_directory_exists
+
+INDEX_COLUMNS = ["Athlete_ID", "Athlete", "Division", "Normalized Name"]
+
+# Letters that Unicode decomposition does not reduce to ASCII
+TRANSLITERATIONS = str.maketrans({
+    "þ": "th", "ð": "d", "đ": "d", "ł": "l", "ø": "o", "æ": "ae", "œ": "oe",
+    "ß": "ss", "ħ": "h", "ı": "i", "ŀ": "l", "ŧ": "t"
+})
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+    "l": "4", **dict.fromkeys("mn", "5"), "r": "6"
+}
+
+
+def normalize_athlete_name(name):
+    """
+    Normalize an athlete display name for matching.
+
+    Casefolds, transliterates letters such as þ, ð and ł, strips diacritics,
+    and treats hyphens, apostrophes and other punctuation as word separators,
+    so "Tia-Clair Toomey-Orr" becomes "tia clair toomey orr" and
+    "Anníe Þórisdóttir" becomes "annie thorisdottir". Letters of other scripts
+    are kept, and a name with no letters or digits falls back to its casefolded
+    text so it never collapses to an empty, shared name.
+
+    Args:
+        name (str): Athlete name as scraped from the leaderboard.
+
+    Returns:
+        str: Normalized name.
+    """
+    if pd.isnull(name):
+        return ""
+    folded = str(name).casefold()
+    decomposed = unicodedata.normalize("NFKD", folded.translate(TRANSLITERATIONS))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.split(r"[\W_]+", stripped)).strip() or " ".join(folded.split())
+
+
+def soundex(token):
+    """
+    Compute the American Soundex code of a name token, e.g. "gazan" -> "g250".
+
+    Args:
+        token (str): Normalized name token. Letters outside a-z are not coded.
+
+    Returns:
+        str: Four-character Soundex code.
+    """
+    code = token[0]
+    previous = SOUNDEX_CODES.get(token[0], "")
+    for char in token[1:]:
+        digit = SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+        if char not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def blocking_keys(normalized_name, division=""):
+    """
+    Generate blocking keys for a normalized name.
+
+    Each key combines the division and first initial with either a
+    four-letter prefix of one of the remaining name tokens or the Soundex
+    code of the last token, so surname typos near the start of the name
+    still share a block. Only names sharing a key are compared, which keeps
+    matching close to linear instead of comparing every pair of athletes.
+
+    Args:
+        normalized_name (str): Output of `normalize_athlete_name`.
+        division (str): Division of the athlete; names in different divisions never match.
+
+    Returns:
+        set: Blocking keys for the name.
+    """
+    tokens = normalized_name.split()
+    if len(tokens) < 2:
+        return {f"{division}|{normalized_name}"}
+    initial = tokens[0][0]
+    keys = {f"{division}|{initial}|{token[:4]}" for token in tokens[1:]}
+    keys.add(f"{division}|{initial}|#{soundex(tokens[-1])}")
+    return keys
+
+
+def _merge_groups(groups, members, group_ids, root_a, root_b):
+    """Merge the group rooted at `root_b` into the group rooted at `root_a`."""
+    if len(members[root_a]) < len(members[root_b]):
+        root_a, root_b = root_b, root_a
+    for node in members[root_b]:
+        groups[node] = root_a
+    members[root_a].extend(members.pop(root_b))
+    if group_ids[root_a] is None:
+        group_ids[root_a] = group_ids[root_b]
+    del group_ids[root_b]
+
+
+def _close(name_a, name_b, threshold):
+    """Return True if the similarity ratio of two strings reaches `threshold`."""
+    matcher = SequenceMatcher(None, name_a, name_b)
+    return matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold
+
+
+def _similar(name_a, name_b, threshold, first_name_threshold):
+    """
+    Return True if two normalized names are near-duplicates.
+
+    First names must be nearly identical, so "jake smith" and "jane smith"
+    stay apart. Surnames match if one name's surname tokens contain the
+    other's (an added hyphenated surname) or if they are similar enough to
+    be a typo.
+    """
+    first_a, *rest_a = name_a.split()
+    first_b, *rest_b = name_b.split()
+    if not rest_a or not rest_b:
+        return _close(name_a, name_b, first_name_threshold)
+    if first_a != first_b and not _close(first_a, first_b, first_name_threshold):
+        return False
+    if set(rest_a) <= set(rest_b) or set(rest_b) <= set(rest_a):
+        return True
+    return _close(" ".join(rest_a), " ".join(rest_b), threshold)
+
+
+def _split_block(members, max_block_size):
+    """
+    Split an oversized block by full first name.
+
+    Returns:
+        tuple: (list of sub-blocks small enough to compare, number of names left unblocked)
+    """
+    sub_blocks = defaultdict(list)
+    for member in members:
+        sub_blocks[member[1].split()[0]].append(member)
+    kept = [block for block in sub_blocks.values() if len(block) <= max_block_size]
+    skipped = sum(len(block) for block in sub_blocks.values() if len(block) > max_block_size)
+    return kept, skipped
+
+
+def build_athlete_index(names, divisions=None, existing_index=None, threshold=0.8, first_name_threshold=0.85,
+                        max_block_size=500):
+    """
+    Build an athlete identity index that assigns stable integer IDs to names.
+
+    Names are normalized, exact normalized matches within a division are
+    collapsed, and near-duplicates are resolved by comparing names only
+    within their blocks. Blocks larger than `max_block_size` are split by
+    first name; any sub-block that is still too large is skipped and reported.
+    IDs from `existing_index` are preserved, so the index can be extended
+    with new competitions without renumbering earlier athletes.
+
+    Args:
+        names (iterable): Athlete display names to index.
+        divisions (iterable, optional): Division of each name. Athletes are only
+            merged within the same division.
+        existing_index (pd.DataFrame, optional): Previously built index.
+        threshold (float): Minimum similarity ratio for two surnames to be merged.
+        first_name_threshold (float): Minimum similarity ratio for two first names to be merged.
+        max_block_size (int): Largest block compared pair by pair.
+
+    Returns:
+        pd.DataFrame: Index with Athlete_ID, Athlete, Division and Normalized Name
+        columns, one row per distinct display name and division.
+    """
+    if existing_index is None:
+        existing_index = pd.DataFrame(columns=INDEX_COLUMNS)
+    existing_index = existing_index.reindex(columns=INDEX_COLUMNS)
+    existing_index["Division"] = existing_index["Division"].fillna("")
+
+    names = list(names)
+    entries = pd.DataFrame({
+        "Athlete": names,
+        "Division": list(divisions) if divisions is not None else [""] * len(names)
+    }).dropna(subset=["Athlete"])
+    entries["Division"] = entries["Division"].fillna("").astype(str)
+    entries = entries[entries["Athlete"].astype(str).str.strip() != ""].drop_duplicates()
+    known = pd.MultiIndex.from_frame(existing_index[["Athlete", "Division"]])
+    new_entries = entries[~pd.MultiIndex.from_frame(entries).isin(known)].copy()
+    new_entries["Normalized Name"] = new_entries["Athlete"].map(normalize_athlete_name)
+
+    # Each node is a (division, normalized name) pair, in first-seen order
+    known_ids = existing_index.groupby(["Division", "Normalized Name"])["Athlete_ID"].min().to_dict()
+    nodes = list(dict.fromkeys(
+        list(zip(existing_index["Division"], existing_index["Normalized Name"]))
+        + list(zip(new_entries["Division"], new_entries["Normalized Name"]))
+    ))
+
+    # Group names into blocks, splitting oversized ones by first name
+    blocks = defaultdict(list)
+    for node in nodes:
+        for key in blocking_keys(node[1], node[0]):
+            blocks[key].append(node)
+    comparable_blocks = []
+    skipped_names = 0
+    for members in blocks.values():
+        if len(members) <= max_block_size:
+            comparable_blocks.append(members)
+        else:
+            kept, skipped = _split_block(members, max_block_size)
+            comparable_blocks.extend(kept)
+            skipped_names += skipped
+    if skipped_names:
+        print(f"Skipped {skipped_names} names in blocks larger than {max_block_size} after splitting by first name")
+
+    # Start from the groups of the existing index, one group per existing ID
+    groups = {node: node for node in nodes}
+    members = {node: [node] for node in nodes}
+    group_ids = {node: known_ids.get(node) for node in nodes}
+    id_roots = {}
+    for node, athlete_id in known_ids.items():
+        root = id_roots.setdefault(athlete_id, node)
+        if root != node:
+            _merge_groups(groups, members, group_ids, root, node)
+
+    # Merge near-duplicates within each block. Two groups only merge when every
+    # name in one matches every name in the other, so a name like "john smith
+    # jones" cannot bridge "john smith" and "john jones", and groups that already
+    # carry different existing IDs are never merged.
+    for block in comparable_blocks:
+        for i, node_a in enumerate(block):
+            for node_b in block[i + 1:]:
+                root_a, root_b = groups[node_a], groups[node_b]
+                if root_a == root_b or None not in (group_ids[root_a], group_ids[root_b]):
+                    continue
+                if all(_similar(name_a[1], name_b[1], threshold, first_name_threshold)
+                       for name_a in members[root_a] for name_b in members[root_b]):
+                    _merge_groups(groups, members, group_ids, root_a, root_b)
+
+    # Give new groups IDs after the highest existing one
+    next_id = int(existing_index["Athlete_ID"].max()) + 1 if len(existing_index) else 1
+    for node in nodes:
+        root = groups[node]
+        if group_ids[root] is None:
+            group_ids[root] = next_id
+            next_id += 1
+
+    new_entries["Athlete_ID"] = [
+        group_ids[groups[node]] for node in zip(new_entries["Division"], new_entries["Normalized Name"])
+    ]
+    index = pd.concat([existing_index, new_entries[INDEX_COLUMNS]], ignore_index=True)
+    return index.astype({"Athlete_ID": "int64"})
+
+
+def add_athlete_ids(df, athlete_index, name_column="Athlete", division_column="Division"):
+    """
+    Add an integer Athlete_ID column to a DataFrame by looking up its names.
+
+    Names are looked up together with their division when `df` has a
+    division column, and by name alone otherwise.
+
+    Args:
+        df (pd.DataFrame): DataFrame with an athlete name column.
+        athlete_index (pd.DataFrame): Index from `build_athlete_index`.
+        name_column (str): Name of the column holding athlete names.
+        division_column (str): Name of the column holding divisions.
+
+    Returns:
+        pd.DataFrame: Copy of `df` with an Athlete_ID column after the name column.
+    """
+    df = df.drop(columns=["Athlete_ID"], errors="ignore")
+    divisions = df[division_column].fillna("").astype(str) if division_column in df else pd.Series("", index=df.index)
+    index = athlete_index.assign(Division=athlete_index["Division"].fillna(""))
+    id_lookup = index.drop_duplicates(["Athlete", "Division"]).set_index(["Athlete", "Division"])["Athlete_ID"]
+    athlete_ids = id_lookup.reindex(pd.MultiIndex.from_arrays([df[name_column], divisions])).to_numpy()
+    df.insert(df.columns.get_loc(name_column) + 1, "Athlete_ID", pd.array(athlete_ids, dtype="Int64"))
+    return df
+
+
+def update_athlete_index(leaderboard_df, index_path):
+    """
+    Extend the athlete index on disk with the athletes of a leaderboard.
+
+    Args:
+        leaderboard_df (pd.DataFrame): Leaderboard with Athlete and Division columns.
+        index_path (str): Path of the athlete index CSV to create or update.
+
+    Returns:
+        pd.DataFrame: The updated athlete index.
+    """
+    existing_index = pd.read_csv(index_path, keep_default_na=False) if os.path.exists(index_path) else None
+    athlete_index = build_athlete_index(leaderboard_df["Athlete"], leaderboard_df["Division"], existing_index)
+
+    ensure_directory_exists(index_path)
+    athlete_index.to_csv(index_path, index=False)
+    print(f"Athlete index with {athlete_index['Athlete_ID'].nunique()} athletes saved to {index_path}")
+    return athlete_index
+
+
+if __name__ == "__main__":
+    # Define input and output file paths
+    input_file = "../data/processed/rogue_leaderboard_2024.csv"
+    output_file = "../data/processed/athlete_index.csv"
+
+    # Build or extend the athlete index
+    update_athlete_index(pd.read_csv(input_file), output_file)
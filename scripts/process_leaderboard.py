@@ -1,16 +1,21 @@
 import pandas as pd
 from bs4 import BeautifulSoup
 
+from athlete_index import add_athlete_ids, update_athlete_index
+from snapshot import write_snapshot
 from utils import ensure_directory_exists
+from validate_leaderboard import ANOMALY_COLUMNS, summarize_anomalies, validate_leaderboard
 
 
-def parse_leaderboard(file_path, division_name):
+def parse_leaderboard(file_path, division_name, skipped_rows=None):
     """
     Parse the leaderboard data from an HTML file.
 
     Args:
         file_path (str): Path to the HTML file.
         division_name (str): Name of the division (e.g., "Men", "Women").
+        skipped_rows (list, optional): Receives one anomaly record per athlete row
+            that could not be parsed and was skipped.
 
     Returns:
         pd.DataFrame: Processed leaderboard data for the division.
@@ -30,16 +35,14 @@ def parse_leaderboard(file_path, division_name):
 
     # Extract each athlete's leaderboard row
     for athlete_row in soup.select(".embedded-leaderboard-item--body"):
+        name = None
         try:
             # Extract overall rank
             rank = athlete_row.select_one(".embedded-leaderboard-item__rank--overall").text.strip()
-            rank_list.append(rank)
 
             # Extract name and points
             name = athlete_row.select_one(".embedded-leaderboard-item__name").text.strip()
             points = athlete_row.select_one(".embedded-leaderboard-item__score--overall").text.strip()
-            name_list.append(name)
-            points_list.append(points)
 
             # Extract event scores (E1 through E9)
             event_scores = []
@@ -49,12 +52,24 @@ def parse_leaderboard(file_path, division_name):
                 event_score = " | ".join(
                     span.text.strip() for span in event.select(".embedded-leaderboard-item__score--workout span"))
                 event_scores.append(f"{event_rank}: {event_score}")
-
-            event_scores_list.append(event_scores)
         except AttributeError as e:
             print(f"Error parsing athlete row: {e}")
+            if skipped_rows is not None:
+                skipped_rows.append({
+                    "Division": division_name,
+                    "Athlete": name,
+                    "Event": None,
+                    "Check": "unparsed_row",
+                    "Value": " ".join(athlete_row.get_text(" ").split())
+                })
             continue
 
+        # Only keep rows that parsed completely, so the columns stay aligned
+        rank_list.append(rank)
+        name_list.append(name)
+        points_list.append(points)
+        event_scores_list.append(event_scores)
+
     # Build DataFrame
     df = pd.DataFrame({
         "Rank": rank_list,
@@ -96,7 +111,8 @@ def expand_event_columns(df):
     return df.drop(columns=event_columns)
 
 
-def process_all_divisions(html_paths, division_names, output_path):
+def process_all_divisions(html_paths, division_names, output_path, snapshot_dir=None, event_details_path=None,
+                          index_path=None, anomalies_path=None):
     """
     Process leaderboard data for all divisions, expand event columns, and save the result.
 
@@ -104,18 +120,49 @@ def process_all_divisions(html_paths, division_names, output_path):
         html_paths (list): List of file paths to the HTML files.
         division_names (list): Corresponding division names.
         output_path (str): Path to save the processed leaderboard CSV.
+        snapshot_dir (str, optional): Directory to also write a binary snapshot to.
+        event_details_path (str, optional): Processed event details CSV to include in the snapshot.
+        index_path (str, optional): Athlete index CSV to extend and take Athlete_IDs from.
+        anomalies_path (str, optional): Path to save the validation anomalies CSV.
+
+    Returns:
+        pd.DataFrame: Validation anomalies, including athlete rows skipped while parsing.
     """
     combined_df = pd.DataFrame()
+    skipped_rows = []
 
     # Process each division
     for file_path, division_name in zip(html_paths, division_names):
         print(f"Processing division: {division_name} from {file_path}")
-        division_df = parse_leaderboard(file_path, division_name)
+        division_df = parse_leaderboard(file_path, division_name, skipped_rows)
         combined_df = pd.concat([combined_df, division_df], ignore_index=True)
 
-    # Expand event columns for the combined data
+    # Expand event columns for the combined data, keeping the raw cells for validation
+    raw_df = combined_df.copy()
     combined_df = expand_event_columns(combined_df)
 
+    # Validate the whole parsed table and report anomalies in bulk
+    anomalies = pd.concat([
+        pd.DataFrame(skipped_rows, columns=ANOMALY_COLUMNS),
+        validate_leaderboard(combined_df, raw_df)
+    ], ignore_index=True)
+    if anomalies.empty:
+        print("Validation passed: no anomalies found")
+    else:
+        print(f"Validation found {len(anomalies)} anomalies:")
+        print(summarize_anomalies(anomalies))
+
+    # Save the anomalies so they can be reviewed row by row
+    if anomalies_path is not None:
+        ensure_directory_exists(anomalies_path)
+        anomalies.to_csv(anomalies_path, index=False)
+        print(f"Validation anomalies saved to {anomalies_path}")
+
+    # Assign integer athlete IDs from the athlete index
+    if index_path is not None:
+        athlete_index = update_athlete_index(combined_df, index_path)
+        combined_df = add_athlete_ids(combined_df, athlete_index)
+
     # Ensure the output directory exists
     ensure_directory_exists(output_path)
 
@@ -123,12 +170,24 @@ def process_all_divisions(html_paths, division_names, output_path):
     combined_df.to_csv(output_path, index=False)
     print(f"Combined leaderboard saved to {output_path}")
 
+    # Write the memory-mappable snapshot
+    if snapshot_dir is not None:
+        event_details_df = pd.read_csv(event_details_path) if event_details_path else None
+        write_snapshot(combined_df, snapshot_dir, event_details_df)
+
+    return anomalies
+
 
 if __name__ == "__main__":
     # Define HTML paths and divisions
     html_paths = ["../data/html/women_division.html", "../data/html/men_division.html"]
     division_names = ["Women", "Men"]
     output_file = "../data/processed/rogue_leaderboard_2024.csv"
+    snapshot_dir = "../data/processed/snapshot"
+    event_details_file = "../data/processed/full_event_details.csv"
+    index_file = "../data/processed/athlete_index.csv"
+    anomalies_file = "../data/processed/leaderboard_anomalies.csv"
 
     # Process all divisions and save results
-    process_all_divisions(html_paths, division_names, output_file)
+    process_all_divisions(html_paths, division_names, output_file, snapshot_dir, event_details_file, index_file,
+                          anomalies_file)
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from utils import ensure_directory_exists
+from validate_leaderboard import SCORE_PATTERN
+
+DICTIONARIES_FILE = "dictionaries.json"
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+# Score kinds stored alongside numeric scores
+SCORE_KINDS = ["time", "reps", "cap"]
+
+
+def parse_scores(scores):
+    """
+    Convert Time/Score strings into numbers and score kinds.
+
+    Times ("20:31.82") become seconds, rep counts ("3") stay as reps, and
+    capped scores ("CAP+10") keep the reps remaining at the cap.
+
+    Args:
+        scores (pd.Series): Time/Score strings.
+
+    Returns:
+        tuple: (np.ndarray of float64 values, np.ndarray of int8 kind codes), with
+        NaN and -1 for missing or unparseable scores.
+    """
+    parts = scores.astype("string").str.extract(SCORE_PATTERN)
+    minutes = pd.to_numeric(parts[0], errors="coerce")
+    seconds = pd.to_numeric(parts[1], errors="coerce")
+    reps = pd.to_numeric(parts[2], errors="coerce")
+    cap_reps = pd.to_numeric(parts[3], errors="coerce")
+
+    values = (minutes * 60 + seconds).fillna(reps).fillna(cap_reps).to_numpy(np.float64)
+    kinds = np.select(
+        [cap_reps.notna(), minutes.notna(), reps.notna()],
+        [SCORE_KINDS.index("cap"), SCORE_KINDS.index("time"), SCORE_KINDS.index("reps")],
+        default=-1
+    ).astype(np.int8)
+    return values, kinds
+
+
+def write_snapshot(leaderboard_df, output_dir, event_details_df=None):
+    """
+    Write a binary snapshot of the processed competition.
+
+    Each column is saved as its own .npy file so it can be memory-mapped on
+    load. Division and event columns are dictionary-encoded as integer codes,
+    the stable Athlete_ID is stored as is when present, and display names are
+    dictionary-encoded for labels. The dictionaries and the list of arrays are
+    saved to a small JSON file.
+
+    Every snapshot is an immutable version directory under `versions/`, named
+    after a hash of its contents. Once it is fully written, the `CURRENT`
+    pointer file is atomically replaced to name it, so readers always see one
+    complete version and memory-mapped files are never rewritten. The current
+    and previous versions are kept for readers that resolved the pointer just
+    before the switch; older versions are removed.
+
+    Args:
+        leaderboard_df (pd.DataFrame): Leaderboard as returned by `expand_event_columns`.
+        output_dir (str): Directory to write the snapshot to.
+        event_details_df (pd.DataFrame, optional): Event details with Event,
+            Event Name, Event Type and Intensity Level columns.
+    """
+    output_dir = os.path.normpath(output_dir)
+    ensure_directory_exists(output_dir)
+
+    events = [col[:-len("_Placement")] for col in leaderboard_df.columns if col.endswith("_Placement")]
+    athlete_codes, athletes = pd.factorize(leaderboard_df["Athlete"])
+    division_codes, divisions = pd.factorize(leaderboard_df["Division"])
+
+    placements = leaderboard_df[[f"{event}_Placement" for event in events]].apply(pd.to_numeric, errors="coerce")
+    scores = leaderboard_df[[f"{event}_Time/Score" for event in events]]
+    parsed_scores = [parse_scores(scores[col]) for col in scores.columns]
+
+    arrays = {}
+    if "Athlete_ID" in leaderboard_df.columns:
+        arrays["athlete_id"] = pd.to_numeric(leaderboard_df["Athlete_ID"]).fillna(-1).to_numpy(np.int64)
+    arrays.update({
+        "athlete": athlete_codes.astype(np.int32),
+        "division": division_codes.astype(np.int8),
+        "rank": pd.to_numeric(leaderboard_df["Rank"], errors="coerce").fillna(-1).to_numpy(np.int16),
+        "points": pd.to_numeric(leaderboard_df["Points"].astype(str).str.extract(r"(\d+)")[0],
+                                errors="coerce").fillna(-1).to_numpy(np.int16),
+        "placements": placements.fillna(-1).to_numpy(np.int16),
+        "scores": np.column_stack([values for values, _ in parsed_scores]),
+        "score_kinds": np.column_stack([kinds for _, kinds in parsed_scores])
+    })
+
+    dictionaries = {
+        "athletes": list(athletes),
+        "divisions": list(divisions),
+        "events": events,
+        "score_kinds": SCORE_KINDS
+    }
+
+    if event_details_df is not None:
+        event_details = event_details_df.set_index("Event").reindex(events)
+        event_type_codes, event_types = pd.factorize(event_details["Event Type"])
+        arrays["event_type"] = event_type_codes.astype(np.int8)
+        arrays["intensity_level"] = event_details["Intensity Level"].fillna(-1).to_numpy(np.int8)
+        dictionaries["event_names"] = event_details["Event Name"].tolist()
+        dictionaries["event_types"] = list(event_types)
+
+    dictionaries["arrays"] = list(arrays)
+
+    # Name the version after its contents, so rewriting unchanged data is a no-op
+    digest = hashlib.sha256(json.dumps(dictionaries, sort_keys=True).encode("utf-8"))
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode("utf-8"))
+        digest.update(array.tobytes())
+    version = digest.hexdigest()[:16]
+
+    versions_dir = os.path.join(output_dir, VERSIONS_DIR)
+    version_dir = os.path.join(versions_dir, version)
+    os.makedirs(versions_dir, exist_ok=True)
+    if not os.path.exists(version_dir):
+        temp_dir = tempfile.mkdtemp(prefix=f".{version}.tmp-", dir=versions_dir)
+        for name, array in arrays.items():
+            np.save(os.path.join(temp_dir, f"{name}.npy"), array)
+        with open(os.path.join(temp_dir, DICTIONARIES_FILE), "w", encoding="utf-8") as file:
+            json.dump(dictionaries, file, ensure_ascii=False, indent=2)
+        os.chmod(temp_dir, 0o755)
+        os.replace(temp_dir, version_dir)
+
+    # Atomically point readers at the new version
+    previous = _read_current(output_dir)
+    fd, temp_pointer = tempfile.mkstemp(prefix=f".{CURRENT_FILE}.tmp-", dir=output_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        file.write(f"{version}\n")
+    os.chmod(temp_pointer, 0o644)
+    os.replace(temp_pointer, os.path.join(output_dir, CURRENT_FILE))
+
+    # Keep the current and previous versions, remove the rest
+    for name in os.listdir(versions_dir):
+        if name not in (version, previous) and not name.startswith("."):
+            shutil.rmtree(os.path.join(versions_dir, name))
+    print(f"Snapshot {version} saved to {output_dir}")
+
+
+def _read_current(snapshot_dir):
+    """Return the version named by the snapshot's CURRENT pointer, or None if there is none."""
+    try:
+        with open(os.path.join(snapshot_dir, CURRENT_FILE), "r", encoding="utf-8") as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_snapshot(snapshot_dir, mmap_mode="r"):
+    """
+    Load a snapshot written by `write_snapshot`.
+
+    The `CURRENT` pointer is resolved once and everything is read from that
+    version's directory, so a concurrent write never mixes two versions. Only
+    the arrays listed in the version's dictionaries file are loaded. They are
+    memory-mapped by default, so loading does not read the data and processes
+    loading the same snapshot share the same pages.
+
+    Args:
+        snapshot_dir (str): Directory containing the snapshot.
+        mmap_mode (str, optional): Passed to `np.load`; use None to read into memory.
+
+    Returns:
+        dict: Arrays keyed by column name, plus a "dictionaries" entry with the
+        athlete, division and event dictionaries and a "version" entry.
+    """
+    version = _read_current(snapshot_dir)
+    if version is None:
+        raise FileNotFoundError(f"No snapshot found in {snapshot_dir}")
+    version_dir = os.path.join(snapshot_dir, VERSIONS_DIR, version)
+    with open(os.path.join(version_dir, DICTIONARIES_FILE), "r", encoding="utf-8") as file:
+        snapshot = {"dictionaries": json.load(file), "version": version}
+    for name in snapshot["dictionaries"]["arrays"]:
+        snapshot[name] = np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+    return snapshot
+
+
+def snapshot_to_long(snapshot):
+    """
+    Expand a snapshot into a long DataFrame with one row per athlete and event.
+
+    Args:
+        snapshot (dict): Output of `load_snapshot`.
+
+    Returns:
+        pd.DataFrame: Athlete, Athlete_ID (when stored), Division, Event_ID, Placement,
+        Score and Score Kind columns, with athlete name, division and event columns
+        as categoricals.
+    """
+    dictionaries = snapshot["dictionaries"]
+    n_athletes, n_events = snapshot["placements"].shape
+    placements = snapshot["placements"].ravel()
+
+    columns = {
+        "Athlete": pd.Categorical.from_codes(np.repeat(snapshot["athlete"], n_events), dictionaries["athletes"])
+    }
+    if "athlete_id" in snapshot:
+        athlete_ids = np.repeat(snapshot["athlete_id"], n_events)
+        columns["Athlete_ID"] = pd.array(np.where(athlete_ids >= 0, athlete_ids, np.nan)).astype("Int64")
+    long_df = pd.DataFrame({
+        **columns,
+        "Division": pd.Categorical.from_codes(np.repeat(snapshot["division"], n_events), dictionaries["divisions"]),
+        "Event_ID": pd.Categorical.from_codes(np.tile(np.arange(n_events), n_athletes), dictionaries["events"]),
+        "Placement": np.where(placements >= 0, placements, np.nan),
+        "Score": snapshot["scores"].ravel(),
+        "Score Kind": pd.Categorical.from_codes(snapshot["score_kinds"].ravel(), dictionaries["score_kinds"])
+    })
+    return long_df.dropna(subset=["Placement"]).reset_index(drop=True)
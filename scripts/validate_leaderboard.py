@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+# Points awarded per event placement: 100 for first down to 10 for 19th, none for last.
+# Tied athletes each receive the points for the shared placement.
+POINTS_TABLE = pd.Series([105 - 5 * place for place in range(1, 20)] + [0], index=range(1, 21))
+
+# Time/Score formats: minutes:seconds time, rep count, or CAP+reps remaining.
+# The groups capture minutes, seconds, reps and capped reps for parsing.
+SCORE_PATTERN = r"^(?:(\d+):(\d{2}(?:\.\d+)?)|(\d+(?:\.\d+)?)|CAP\+(\d+))\s*$"
+SCORE_DIFF_PATTERN = r"^(?:--|\d+(?::\d{2})?(?:\.\d+)?)$"
+
+ANOMALY_COLUMNS = ["Division", "Athlete", "Event", "Check", "Value"]
+
+
+def _collect_anomalies(df, mask, values, check):
+    """
+    Turn a boolean mask over event columns into one anomaly row per flagged cell.
+
+    Args:
+        df (pd.DataFrame): Expanded leaderboard, used for Division and Athlete.
+        mask (pd.DataFrame): Boolean mask with one column per event.
+        values (pd.DataFrame): Offending values, aligned with `mask`.
+        check (str): Name of the check that produced the mask.
+
+    Returns:
+        pd.DataFrame: Anomaly rows for the flagged cells.
+    """
+    rows, cols = np.nonzero(mask.fillna(False).to_numpy(dtype=bool))
+    return pd.DataFrame({
+        "Division": df["Division"].to_numpy()[rows],
+        "Athlete": df["Athlete"].to_numpy()[rows],
+        "Event": mask.columns.to_numpy()[cols],
+        "Check": check,
+        "Value": values.to_numpy()[rows, cols]
+    })
+
+
+def _event_frame(df, events, suffix):
+    """Select the `<event><suffix>` columns of every event, renamed to the event IDs."""
+    frame = df[[f"{event}{suffix}" for event in events]]
+    frame.columns = events
+    return frame
+
+
+def validate_leaderboard(df, raw_df=None, expected_events=None, points_table=POINTS_TABLE):
+    """
+    Validate an expanded leaderboard and report every anomaly found.
+
+    All checks run column-wise over the whole table:
+    - missing_event: an athlete has no result for an expected event.
+    - unexpected_event: an athlete has a placement for an event that is not expected.
+    - unparseable_cell: the raw event cell has text that `expand_event_columns`
+      could not parse; the raw text is reported as the Value.
+    - placement_order: placements of an event within a division are not a
+      valid ranking (1, 2, 2, 4, ... with ties allowed).
+    - score_format / score_diff_format: a Time/Score or Time/Score_Diff value
+      does not look like a time, rep count or CAP+reps score.
+    - points_mismatch: Points differ from the sum of points for the placements.
+    - rank_order: a better Rank has fewer Points than a worse one.
+
+    Args:
+        df (pd.DataFrame): Leaderboard as returned by `expand_event_columns`.
+        raw_df (pd.DataFrame, optional): The same leaderboard before expansion, with
+            its raw E1...En cells. Without it, unparseable cells count as missing events.
+        expected_events (list, optional): Event IDs every athlete should have.
+            Defaults to all events present in `df`.
+        points_table (pd.Series): Points awarded per placement.
+
+    Returns:
+        pd.DataFrame: One row per anomaly with Division, Athlete, Event, Check and Value.
+    """
+    if expected_events is None:
+        expected_events = [col[:-len("_Placement")] for col in df.columns if col.endswith("_Placement")]
+    events = [event for event in expected_events if f"{event}_Placement" in df.columns]
+    anomalies = []
+
+    # Placements for events outside the expected ones
+    all_events = [col[:-len("_Placement")] for col in df.columns if col.endswith("_Placement")]
+    extra = [event for event in all_events if event not in expected_events]
+    if extra:
+        extra_placements = _event_frame(df, extra, "_Placement")
+        anomalies.append(_collect_anomalies(df, extra_placements.notna(), extra_placements, "unexpected_event"))
+
+    # Events missing entirely from the table count as missing for every athlete
+    absent = [event for event in expected_events if event not in events]
+    if absent:
+        absent_mask = pd.DataFrame(True, index=df.index, columns=absent)
+        absent_values = pd.DataFrame(np.nan, index=df.index, columns=absent)
+        anomalies.append(_collect_anomalies(df, absent_mask, absent_values, "missing_event"))
+
+    raw_placements = _event_frame(df, events, "_Placement")
+    placements = raw_placements.apply(pd.to_numeric, errors="coerce")
+    scores = _event_frame(df, events, "_Time/Score").astype("string")
+    score_diffs = _event_frame(df, events, "_Time/Score_Diff").astype("string")
+
+    # Every expected event needs a placement; raw cells that failed to parse are reported separately
+    if raw_df is not None:
+        raw_cells = raw_df.reindex(index=df.index, columns=events).astype("string")
+        unparsed = placements.isna() & raw_cells.notna() & raw_cells.apply(lambda col: col.str.strip().ne(""))
+    else:
+        raw_cells = raw_placements
+        unparsed = pd.DataFrame(False, index=df.index, columns=events)
+    anomalies.append(_collect_anomalies(df, placements.isna() & ~unparsed, raw_placements, "missing_event"))
+    anomalies.append(_collect_anomalies(df, unparsed, raw_cells, "unparseable_cell"))
+
+    # Placements must equal their competition ranking within each division
+    ranking = placements.groupby(df["Division"]).rank(method="min")
+    anomalies.append(_collect_anomalies(df, placements.notna() & placements.ne(ranking), raw_placements,
+                                        "placement_order"))
+
+    # Score formats
+    bad_scores = scores.notna() & ~scores.apply(lambda col: col.str.match(SCORE_PATTERN)).fillna(False)
+    anomalies.append(_collect_anomalies(df, bad_scores, scores, "score_format"))
+    bad_diffs = score_diffs.notna() & ~score_diffs.apply(
+        lambda col: col.str.match(SCORE_DIFF_PATTERN)).fillna(False)
+    anomalies.append(_collect_anomalies(df, bad_diffs, score_diffs, "score_diff_format"))
+
+    # Total points must match the points for each placement, expected or not
+    points = pd.to_numeric(df["Points"].astype(str).str.extract(r"(\d+)")[0], errors="coerce")
+    all_placements = _event_frame(df, all_events, "_Placement").apply(pd.to_numeric, errors="coerce")
+    expected_points = all_placements.apply(lambda col: col.map(points_table)).fillna(0).sum(axis=1)
+    points_mask = pd.DataFrame({"Points": points.isna() | points.ne(expected_points)})
+    anomalies.append(_collect_anomalies(df, points_mask, df[["Points"]], "points_mismatch"))
+
+    # Overall rank must not put an athlete above someone with more points
+    rank = pd.to_numeric(df["Rank"], errors="coerce")
+    by_rank = pd.DataFrame({"Division": df["Division"], "Rank": rank, "Points": points}).sort_values(
+        ["Division", "Rank"])
+    fewest_points_above = by_rank.groupby("Division")["Points"].cummin().groupby(by_rank["Division"]).shift()
+    rank_mask = pd.DataFrame({"Rank": (by_rank["Points"] > fewest_points_above).reindex(df.index)})
+    anomalies.append(_collect_anomalies(df, rank_mask, df[["Rank"]], "rank_order"))
+
+    return pd.concat(anomalies, ignore_index=True).reindex(columns=ANOMALY_COLUMNS)
+
+
+def summarize_anomalies(anomalies):
+    """
+    Count anomalies per check and division.
+
+    Args:
+        anomalies (pd.DataFrame): Output of `validate_leaderboard`.
+
+    Returns:
+        pd.DataFrame: Anomaly counts with one row per check and one column per division.
+    """
+    return anomalies.groupby(["Check", "Division"]).size().unstack(fill_value=0)